@@ -3,12 +3,14 @@ import PyInstaller.__main__
 PyInstaller.__main__.run([
     'main.py',
     '--name=CommitReview',
-    '--onefile', 
+    '--onedir', 
     '--windowed', 
-    '--hidden-import=customtkinter',
+    '--collect-submodules=customtkinter',
     '--hidden-import=git',
     '--hidden-import=ollama',
     '--hidden-import=tkinter',
-    '--hidden-import=PIL', 
+    '--exclude-module=PIL',
+    '--exclude-module=numpy',
+    '--exclude-module=pandas',
     '--clean' 
 ])
\ No newline at end of file
@@ -1,37 +1,95 @@
 import ollama
 
-def ai_response(prompt):
-    response = ollama.chat(model='llama3.2', messages=[
-        {
-            'role': 'system',
-            'content': """You are an expert code reviewer analyzing Git commits. Your task is to:
-            
-            1. Evaluate code quality, readability, and adherence to best practices
-            2. Assess the commit message clarity and completeness
-            3. Identify potential bugs, security issues, or performance concerns
-            4. Suggest specific improvements with clear examples where applicable
-
-            Provide your analysis in a structured format:
-
-            ## Summary
-            [Brief 1-2 sentence overview of the changes]
-
-            ## Code Review
-            - [Key observations about code quality]
-            - [Potential issues or improvements]
-
-            ## Commit Message Review
-            - [Assessment of commit message quality]
-            - [Suggested improvements if needed]
-
-            ## Recommendations
-            - [Prioritized actionable items]
-
-            Format your response in markdown for readability.""",
-        },
-        {
-            'role': 'user',
-            'content': prompt,
-        },
-    ])
-    return response['message']['content']
\ No newline at end of file
+# Model settings shared by every request
+MODEL = 'llama3.2'
+KEEP_ALIVE = '30m'  # Keep the model loaded between checks
+OPTIONS = {'num_ctx': 4096}
+
+# One client for the whole app so connections to the server are reused
+_async_client = ollama.AsyncClient()
+
+# System prompt shared by every review request. It never changes, so Ollama can reuse
+# the cached prefix across requests; everything specific to a commit goes in the user message.
+_SYSTEM_MSG = {
+    'role': 'system',
+    'content': """You are an expert code reviewer analyzing Git commits. Each commit is given as its
+COMMIT HASH, AUTHOR, DATE, COMMIT MESSAGE and FILES CHANGED, followed by its DIFF. Your task is to:
+
+1. Evaluate code quality, readability, and adherence to best practices
+2. Assess the commit message clarity and completeness
+3. Identify potential bugs, security issues, or performance concerns
+4. Suggest specific improvements with clear examples where applicable
+
+Provide your analysis in a structured format:
+
+## Summary
+[Brief 1-2 sentence overview of the changes]
+
+## Code Review
+- [Key observations about code quality]
+- [Potential issues or improvements]
+
+## Commit Message Review
+- [Assessment of commit message quality]
+- [Suggested improvements if needed]
+
+## Recommendations
+- [Prioritized actionable items]
+
+Format your response in markdown for readability.""",
+}
+
+# Context budget, at roughly 3 characters per token
+CHARS_PER_TOKEN = 3
+REPLY_TOKENS = 1024  # Kept free for the review of a single commit
+DETAILS_TOKENS = 512  # Commit info and file list sent along with the diff
+_SYSTEM_TOKENS = len(_SYSTEM_MSG['content']) // CHARS_PER_TOKEN
+
+# What fits in the user message and the reply once the system prompt is in
+MAX_PROMPT_CHARS = (OPTIONS['num_ctx'] - _SYSTEM_TOKENS) * CHARS_PER_TOKEN
+
+# What is left of that for the diff of a single commit
+MAX_DIFF_CHARS = MAX_PROMPT_CHARS - (DETAILS_TOKENS + REPLY_TOKENS) * CHARS_PER_TOKEN
+
+def _build_messages(prompt):
+    """
+    Build the chat messages for a commit review.
+
+    Args:
+        prompt (str): User prompt containing commit info
+
+    Returns:
+        list[dict]: System and user messages for the model
+    """
+    return [_SYSTEM_MSG, {'role': 'user', 'content': prompt}]
+
+async def stream_ai_response_async(prompt):
+    """
+    Stream an AI response from Ollama model without blocking the event loop.
+
+    Args:
+        prompt (str): User prompt containing commit info
+
+    Yields:
+        str: Chunks of the AI-generated code review
+
+    Raises:
+        Exception: If the request fails, possibly after some chunks were already yielded
+    """
+    async for chunk in await _async_client.chat(
+        model=MODEL, messages=_build_messages(prompt), options=OPTIONS, keep_alive=KEEP_ALIVE, stream=True
+    ):
+        yield chunk['message']['content']
+
+async def warm_up_async():
+    """
+    Load the model into memory ahead of the first review, without blocking the event loop.
+
+    Returns:
+        bool: True if the model responded
+    """
+    try:
+        await _async_client.chat(model=MODEL, messages=[{'role': 'user', 'content': 'ok'}], options=OPTIONS, keep_alive=KEEP_ALIVE)
+        return True
+    except Exception:
+        return False
@@ -1,17 +1,61 @@
+import asyncio
 import os
+import re
 import sys
 import threading
 import time
 from datetime import datetime
 import queue
+import shelve
+from hashlib import blake2b
+from fnmatch import fnmatch
+from functools import lru_cache
 from git import Repo, GitCommandError
 import customtkinter as ctk
-import ollama
+from llm import MAX_DIFF_CHARS, MAX_PROMPT_CHARS, MODEL, stream_ai_response_async, warm_up_async
+
+# libgit2 bindings are optional, with them diffs are built in-process instead of by running git
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
+
+# Without pathspec every working tree change is reported, including ignored build output
+try:
+    import pathspec
+except ImportError:
+    pathspec = None
+
+# File watching is optional, without it new commits are only picked up by polling
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
 
 # Set appearance mode and default color theme
 ctk.set_appearance_mode("System")  # Follows system theme (dark/light)
 ctk.set_default_color_theme("blue")  # Blue theme
 
+# Limits on file content sent for the first commit, which has no parent to diff against
+MAX_FILE_BYTES = 8192  # Per file
+MAX_TOTAL_BYTES = 64 * 1024  # Whole commit
+
+# Most changed files named in a prompt, the rest are only counted
+MAX_LISTED_FILES = 50
+
+# Reviews are kept across runs, like other per-user caches
+REVIEW_CACHE_DIR = os.path.expanduser('~/.cache/commit-review')
+
+# Generated files whose diffs are left out of the prompt
+NOISE_FILE_PATTERNS = ('*.lock', '*.min.*', 'package-lock.json')
+NOISE_DIRS = ('vendor', 'node_modules')  # Third-party code checked into the repository
+
+# File watcher events that mean a file changed. Newer watchdog versions also report
+# 'opened' and 'closed_no_write', which reading HEAD would trigger over and over.
+CHANGE_EVENT_TYPES = ('created', 'modified', 'moved', 'deleted', 'closed')
+
 def get_repository_path():
     """
     Gets the repository path, handling both development and PyInstaller environments.
@@ -35,55 +79,368 @@ def get_repository_path():
         # If not, return None to prompt selection
         return None
 
-def ai_response(prompt):
+def review_cache_key(commit_hash):
     """
-    Get AI response from Ollama model with improved prompt engineering.
+    Get the key a commit's review is stored under.
+    
+    Commits are immutable, so the hash identifies the reviewed content. The model
+    is part of the key so switching models doesn't serve reviews from the old one.
     
     Args:
-        prompt (str): User prompt containing commit info
+        commit_hash (str): Hash of the reviewed commit
         
     Returns:
-        str: AI-generated code review
+        str: Cache key
     """
-    try:
-        response = ollama.chat(model='llama3.2', messages=[
-            {
-                'role': 'system',
-                'content': """You are an expert code reviewer analyzing Git commits. Your task is to:
-                
-1. Evaluate code quality, readability, and adherence to best practices
-2. Assess the commit message clarity and completeness
-3. Identify potential bugs, security issues, or performance concerns
-4. Suggest specific improvements with clear examples where applicable
+    return blake2b(f"{MODEL}\0{commit_hash}".encode(), digest_size=20).hexdigest()
+
+@lru_cache(maxsize=None)
+def _open_libgit2_repo(git_dir):
+    """Open a repository with libgit2 once and reuse it"""
+    return pygit2.Repository(git_dir)
+
+def _get_libgit2_commit_diff(git_dir, commit_hash):
+    """
+    Diff a commit against its first parent with libgit2.
+    
+    Args:
+        git_dir (str): Path to the repository's .git directory
+        commit_hash (str): Hash of the commit
+        
+    Returns:
+        pygit2.Diff: Diff of the commit
+    """
+    libgit2_repo = _open_libgit2_repo(git_dir)
+    commit = libgit2_repo[commit_hash]
+    diff = libgit2_repo.diff(commit.parents[0], commit)
+    # Detect renames like git diff does
+    diff.find_similar()
+    return diff
 
-Provide your analysis in a structured format:
+def _get_libgit2_numstat(git_dir, commit_hash):
+    """Get the changed files of a commit with libgit2, see get_commit_numstat"""
+    entries = []
+    for patch in _get_libgit2_commit_diff(git_dir, commit_hash):
+        delta = patch.delta
+        if delta.is_binary:
+            insertions = deletions = None
+        else:
+            _, insertions, deletions = patch.line_stats
+        entries.append((delta.new_file.path, insertions, deletions, delta.old_file.path))
+    return tuple(entries)
 
-## Summary
-[Brief 1-2 sentence overview of the changes]
+@lru_cache(maxsize=32)
+def get_commit_numstat(repo, commit_hash):
+    """
+    Get the files a commit changed with their line counts, without building the patch.
+    
+    Args:
+        repo (git.Repo): Repository containing the commit
+        commit_hash (str): Hash of the commit
+        
+    Returns:
+        tuple: A (path, insertions, deletions, old_path) tuple per file. The counts are None
+            for binary files, old_path is the path before a rename and otherwise the same as path
+    """
+    commit = repo.commit(commit_hash)
+    if commit.parents and pygit2 is not None:
+        return _get_libgit2_numstat(repo.git_dir, commit_hash)
+    
+    # --root lists every file of the first commit as added, -M detects renames like git diff does.
+    # -z keeps paths as they are instead of quoting them or folding renames into 'dir/{a => b}'
+    output = repo.git.diff_tree(
+        '-r', '--root', '-M', '--numstat', '-z', '--no-commit-id', commit_hash, stdout_as_string=False
+    ).decode('utf-8', errors='replace')  # Paths that aren't UTF-8 would otherwise carry lone surrogates
+    entries = []
+    fields = iter(output.split('\0'))
+    for stat in fields:
+        stat = stat.lstrip('\n')
+        if not stat:
+            continue
+        insertions, deletions, path = stat.split('\t', 2)
+        old_path = path
+        if not path:
+            # A rename is followed by its old and new path as separate fields
+            old_path, path = next(fields), next(fields)
+        if insertions == '-':  # Binary file
+            entries.append((path, None, None, old_path))
+        else:
+            entries.append((path, int(insertions), int(deletions), old_path))
+    return tuple(entries)
 
-## Code Review
-- [Key observations about code quality]
-- [Potential issues or improvements]
+def get_commit_diff(repo, commit_hash):
+    """
+    Get the diff of a commit against its first parent.
+    
+    Args:
+        repo (git.Repo): Repository containing the commit
+        commit_hash (str): Hash of the commit
+        
+    Returns:
+        tuple: Diff text and a tuple of the changed file paths
+    """
+    commit = repo.commit(commit_hash)
+    numstat = get_commit_numstat(repo, commit_hash)
+    files_changed = tuple(entry[0] for entry in numstat)
+    
+    # The root commit has no parent to diff against
+    if commit.parents and pygit2 is not None:
+        code_diff = _get_libgit2_commit_diff(repo.git_dir, commit_hash).patch or ""
+    elif commit.parents:
+        # Decode ourselves, GitPython keeps invalid UTF-8 as lone surrogates that can't be sent to the model
+        code_diff = repo.git.diff(
+            commit.parents[0].hexsha, commit_hash, stdout_as_string=False
+        ).decode('utf-8', errors='replace')
+    else:
+        # If this is the first commit, include the start of each file
+        binary_files = {entry[0] for entry in numstat if entry[1] is None}
+        diff_parts = []
+        skipped_files = []
+        total_size = 0
+        files_omitted = False
+        for blob in commit.tree.traverse():
+            if blob.type != 'blob':  # Not a file
+                continue
+            # Don't spend the size budget on generated or binary files, drop_noise_files can't spot them here
+            if is_noise_file(blob.path) or blob.path in binary_files:
+                skipped_files.append(blob.path)
+                continue
+            if total_size >= MAX_TOTAL_BYTES:
+                files_omitted = True
+                continue
+            # Only read the start of each file
+            content = blob.data_stream.read(MAX_FILE_BYTES)
+            diff_parts.append(f"+++ {blob.path}\n".encode('utf-8'))
+            diff_parts.append(b"+"+content.replace(b'\n', b'\n+'))
+            if blob.size > MAX_FILE_BYTES:
+                diff_parts.append(b"\n[File truncated]\n")
+            total_size += len(content)
+        if files_omitted:
+            diff_parts.append(b"\n[Remaining files omitted]")
+        if skipped_files:
+            skipped_list = ', '.join(skipped_files[:MAX_LISTED_FILES])
+            if len(skipped_files) > MAX_LISTED_FILES:
+                skipped_list += f" ... and {len(skipped_files) - MAX_LISTED_FILES} more"
+            diff_parts.append(f"\n[Skipped generated or binary files: {skipped_list}]\n".encode('utf-8'))
+        # Decode everything at once
+        code_diff = b"".join(diff_parts).decode('utf-8', errors='replace')
+    
+    return code_diff, files_changed
 
-## Commit Message Review
-- [Assessment of commit message quality]
-- [Suggested improvements if needed]
+def is_noise_file(path):
+    """Check whether a path is a generated or vendored file"""
+    if any(fnmatch(os.path.basename(path), pattern) for pattern in NOISE_FILE_PATTERNS):
+        return True
+    return any(part in NOISE_DIRS for part in path.split('/')[:-1])
+
+def drop_noise_files(code_diff):
+    """
+    Remove generated and binary files from a diff, they add tokens without helping the review.
+    
+    Args:
+        code_diff (str): Diff in git's patch format
+        
+    Returns:
+        str: Diff without noise files, followed by a note listing what was skipped
+    """
+    kept_sections = []
+    skipped_files = []
+    for section in re.split(r'^(?=diff --git )', code_diff, flags=re.MULTILINE):
+        header = re.match(r'diff --git a/(.*?) b/', section)
+        if header:
+            path = header.group(1)
+            if is_noise_file(path) or re.search(r'^Binary files .* differ$', section, re.MULTILINE):
+                skipped_files.append(path)
+                continue
+        kept_sections.append(section)
+    
+    if skipped_files:
+        kept_sections.append(f"\n[Skipped generated or binary files: {', '.join(skipped_files)}]\n")
+    return "".join(kept_sections)
+
+def omit_deleted_files(code_diff):
+    """
+    Replace the content of deleted files in a diff with a count of their lines.
+    
+    The removed lines only cost tokens, the diff header already says the file is gone.
+    
+    Args:
+        code_diff (str): Diff in git's patch format
+        
+    Returns:
+        str: Diff with the hunks of deleted files replaced by a note
+    """
+    sections = []
+    for section in re.split(r'^(?=diff --git )', code_diff, flags=re.MULTILINE):
+        hunk = re.search(r'^@@ ', section, re.MULTILINE)
+        if hunk and re.search(r'^deleted file mode ', section, re.MULTILINE):
+            removed_lines = len(re.findall(r'^-', section[hunk.start():], re.MULTILINE))
+            section = f"{section[:hunk.start()]}[File deleted, {removed_lines} lines removed]\n"
+        sections.append(section)
+    return "".join(sections)
+
+def truncate_for_context(text, max_chars=MAX_DIFF_CHARS):
+    """
+    Shorten a diff to fit the model context, keeping its beginning and end.
+    
+    Args:
+        text (str): Diff to shorten
+        max_chars (int): Maximum number of characters to keep
+        
+    Returns:
+        str: The original text, or its head and tail joined by a summary of what was left out
+    """
+    if len(text) <= max_chars:
+        return text
+    
+    head = text[:max_chars // 2]
+    tail = text[-(max_chars // 4):]
+    omitted = text[len(head):len(text) - len(tail)]
+    
+    # Name the files whose changes fall in the omitted part
+    omitted_files = re.findall(r'^diff --git a/(.*?) b/', omitted, flags=re.MULTILINE)
+    file_list = ', '.join(omitted_files[:10]) + (', ...' if len(omitted_files) > 10 else '')
+    summary = f"{len(omitted)} characters omitted"
+    if omitted_files:
+        summary += f" across {len(omitted_files)} files: {file_list}"
+    
+    return f"{head}\n... [{summary}] ...\n{tail}"
+
+@lru_cache(maxsize=32)
+def get_prompt_diff(repo, commit_hash, max_chars=MAX_DIFF_CHARS):
+    """
+    Get the diff of a commit as it is sent to the model, caching recent results.
+    
+    Only the shortened diff is kept, the full patch can be much larger.
+    
+    Args:
+        repo (git.Repo): Repository containing the commit
+        commit_hash (str): Hash of the commit
+        max_chars (int): Maximum number of characters of diff to keep
+        
+    Returns:
+        tuple: Diff text without noise files, and a tuple of the changed file paths
+    """
+    code_diff, files_changed = get_commit_diff(repo, commit_hash)
+    code_diff = drop_noise_files(omit_deleted_files(code_diff))
+    return truncate_for_context(code_diff, max_chars), files_changed
+
+class GitRefWatcher(FileSystemEventHandler):
+    """Watches a .git directory and reports changes to HEAD and branch refs"""
+    
+    def __init__(self, git_dir, on_change):
+        """
+        Args:
+            git_dir (str): Path to the repository's .git directory
+            on_change (callable): Called from the watcher thread when a ref changes
+        """
+        super().__init__()
+        self.git_dir = git_dir
+        self.on_change = on_change
+    
+    def _is_ref_path(self, path):
+        """Check whether a path is HEAD, a ref or packed-refs"""
+        rel_path = os.path.relpath(path, self.git_dir).replace(os.sep, '/')
+        # Ignore lock files and fsmonitor daemon noise
+        if rel_path.endswith('.lock') or rel_path.startswith('fsmonitor--daemon/'):
+            return False
+        return rel_path in ('HEAD', 'packed-refs') or rel_path.startswith('refs/')
+    
+    def on_any_event(self, event):
+        """Forward ref updates, including HEAD.lock being renamed to HEAD"""
+        if event.is_directory or event.event_type not in CHANGE_EVENT_TYPES:
+            return
+        paths = [event.src_path, getattr(event, 'dest_path', '')]
+        if any(path and self._is_ref_path(path) for path in paths):
+            self.on_change()
 
-## Recommendations
-- [Prioritized actionable items]
+def load_ignore_spec(repo):
+    """
+    Build a matcher for the paths git ignores in a repository.
+    
+    Combines the top-level .gitignore, .git/info/exclude and the user's global
+    excludes file. Nested .gitignore files are not read.
+    
+    Args:
+        repo (git.Repo): Repository to read the ignore rules of
+        
+    Returns:
+        pathspec.PathSpec: Matcher for ignored paths, or None if pathspec isn't installed
+    """
+    if pathspec is None:
+        return None
+    
+    xdg_config_home = os.environ.get('XDG_CONFIG_HOME') or os.path.expanduser('~/.config')
+    global_excludes = os.path.join(xdg_config_home, 'git', 'ignore')
+    try:
+        global_excludes = repo.config_reader().get_value('core', 'excludesFile', global_excludes)
+    except Exception:
+        pass
+    
+    ignore_files = [
+        os.path.join(repo.working_tree_dir, '.gitignore'),
+        os.path.join(repo.git_dir, 'info', 'exclude'),
+        os.path.expanduser(str(global_excludes)),
+    ]
+    lines = []
+    for ignore_file in ignore_files:
+        try:
+            with open(ignore_file, encoding='utf-8', errors='replace') as f:
+                lines.extend(f.read().splitlines())
+        except OSError:
+            # Missing ignore files are normal
+            continue
+    return pathspec.PathSpec.from_lines('gitwildmatch', lines)
 
-Format your response in markdown for readability.""",
-            },
-            {
-                'role': 'user',
-                'content': prompt,
-            },
-        ])
-        return response['message']['content']
-    except Exception as e:
-        return f"Error generating AI response: {str(e)}\n\nPlease check your Ollama setup and ensure the model is available."
+class WorkTreeWatcher(FileSystemEventHandler):
+    """Watches a working tree and reports changes to files outside .git"""
+    
+    def __init__(self, work_tree, git_dir, on_change, ignore_spec=None):
+        """
+        Args:
+            work_tree (str): Path to the repository's working tree
+            git_dir (str): Path to the repository's .git directory, which is ignored
+            on_change (callable): Called from the watcher thread when a file changes
+            ignore_spec (pathspec.PathSpec): Paths to ignore as well, see load_ignore_spec
+        """
+        super().__init__()
+        self.work_tree = work_tree
+        self.git_dir = git_dir
+        self.on_change = on_change
+        self.ignore_spec = ignore_spec
+    
+    def on_any_event(self, event):
+        """Forward any file change outside the .git directory that git doesn't ignore"""
+        if event.is_directory or event.event_type not in CHANGE_EVENT_TYPES:
+            return
+        # Also covers the fsmonitor daemon's files in .git/fsmonitor--daemon/
+        if os.path.commonpath([event.src_path, self.git_dir]) == self.git_dir:
+            return
+        # Build output and dependencies change constantly during builds, they aren't user edits
+        if self.ignore_spec is not None:
+            rel_path = os.path.relpath(event.src_path, self.work_tree).replace(os.sep, '/')
+            if self.ignore_spec.match_file(rel_path):
+                return
+        self.on_change()
 
 class CommitReviewApp(ctk.CTk):
+    # AI worker tunables
+    OLLAMA_NUM_PARALLEL = 4  # Should match the server's OLLAMA_NUM_PARALLEL setting
+    STREAM_FLUSH_MS = 50  # How often streamed text is pushed to the review textbox
+    
+    # Most new commits reviewed together in one AI request
+    MAX_BATCH_COMMITS = 4
+    BATCH_REPLY_CHARS = 1500  # Context kept free for each commit's review in a batch
+    
+    # Line the model puts between the reviews of a batch, unlike '---' it doesn't occur in markdown
+    REVIEW_SEPARATOR = "<<<END OF REVIEW>>>"
+    
+    # Skip a fetch if another one finished less than this many seconds ago
+    MIN_FETCH_INTERVAL = 10
+    
+    # Idle checks back off up to this many seconds between checks
+    MAX_POLL_INTERVAL = 600
+    
     def __init__(self):
         super().__init__()
 
@@ -104,11 +461,30 @@ class CommitReviewApp(ctk.CTk):
         self.repo = None
         self.repo_path = None
         self.last_commit_hash = None
+        self.last_upstream_hash = None
         self.running = False
-        self.monitor_thread = None
-        self.animation_running = False
+        self._check_after_id = None
+        self._check_in_progress = False
+        self.poll_interval = 30
+        self._ref_observer = None
+        self._ref_change_after_id = None
         self.ai_queue = queue.Queue()
+        self._diff_queue = queue.Queue()
         self.ai_worker_running = True
+        self._fetch_lock = threading.Lock()
+        self._last_fetch_ts = 0.0
+        self._last_remote_hash = None
+        self._review_stream_active = False
+        self._review_request_id = 0  # Identifies the review shown in the textbox
+        self._streaming_review_hash = None
+        self.interactive = True
+        self._deferred_review = None
+        self._pending_status = None
+        self._animation_running = False
+        
+        # Persistent cache of AI reviews, see review_cache_key and _read_cached_reviews
+        os.makedirs(REVIEW_CACHE_DIR, exist_ok=True)
+        self._review_cache_path = os.path.join(REVIEW_CACHE_DIR, 'reviews')
         
         # Create UI components
         self._create_ui()
@@ -117,6 +493,10 @@ class CommitReviewApp(ctk.CTk):
         self.ai_worker_thread = threading.Thread(target=self._ai_worker, daemon=True)
         self.ai_worker_thread.start()
         
+        # Start diff worker thread
+        self.diff_worker_thread = threading.Thread(target=self._diff_worker, daemon=True)
+        self.diff_worker_thread.start()
+        
         # Try to initialize with default repository
         self.repo_path = get_repository_path()
         if self.repo_path:
@@ -127,8 +507,9 @@ class CommitReviewApp(ctk.CTk):
         # Bind close event
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
         
-        # Start progress bar animation
-        self.animate_progress_bar()
+        # Pause the progress animation and hold back reviews while minimized
+        self.bind("<Map>", lambda event: self._on_map_change(event, True))
+        self.bind("<Unmap>", lambda event: self._on_map_change(event, False))
     
     def _create_ui(self):
         """Create and organize all UI components"""
@@ -200,7 +581,7 @@ class CommitReviewApp(ctk.CTk):
         )
         self.status_label.pack(side="left", padx=10, fill="x", expand=True)
         
-        self.progress_bar = ctk.CTkProgressBar(self.status_frame, width=150)
+        self.progress_bar = ctk.CTkProgressBar(self.status_frame, width=150, mode="determinate")
         self.progress_bar.pack(side="right", padx=10)
         self.progress_bar.set(0)
     
@@ -322,53 +703,171 @@ class CommitReviewApp(ctk.CTk):
         )
         self.last_check_label.pack(side="left", padx=10)
     
-    def _ai_worker(self):
-        """Background worker to process AI requests"""
+    def _diff_worker(self):
+        """Background worker to build review prompts and pass them to the AI worker"""
+        # GitPython's Repo isn't thread-safe, so this thread reads objects through its own
+        repo = None
+        repo_path = None
+        
         while self.ai_worker_running:
             try:
                 # Get task from queue with timeout
-                prompt, callback = self.ai_queue.get(timeout=1.0)
+                commit_hashes, on_chunk, on_done = self._diff_queue.get(timeout=1.0)
+            except queue.Empty:
+                # Queue is empty, continue waiting
+                continue
+            
+            try:
+                # Follow the repository the user selected
+                current_path = self.repo_path
+                if repo is None or repo_path != current_path:
+                    if repo is not None:
+                        repo.close()
+                    repo = Repo(current_path)
+                    repo_path = current_path
                 
-                # Process AI request
-                response = ai_response(prompt)
+                commits = [repo.commit(commit_hash) for commit_hash in commit_hashes]
                 
-                # Send result back to main thread
-                self.after(0, lambda r=response: callback(r))
+                # Some commits aren't worth a diff or a model request, describe them instead
+                skip_note = self._get_skip_note(commits[0]) if len(commits) == 1 else None
+                if skip_note is not None:
+                    self.after(0, on_chunk, skip_note)
+                    self.after(0, on_done)
+                    continue
+                
+                if len(commits) == 1:
+                    text_prompt = self._build_review_prompt(commits[0])
+                else:
+                    text_prompt = self._build_batch_review_prompt(commits)
                 
+                if text_prompt is None:
+                    # Too large for one request, review the commits separately instead
+                    self.after(0, lambda h=commit_hashes: self._review_individually(h))
+                else:
+                    self.ai_queue.put((text_prompt, on_chunk, on_done))
+            except Exception as e:
+                self.after(0, lambda e=e: on_done(e))
+            finally:
                 # Mark task as done
-                self.ai_queue.task_done()
+                self._diff_queue.task_done()
+    
+    def _ai_worker(self):
+        """Background worker to process AI requests on its own asyncio event loop"""
+        asyncio.run(self._run_ai_worker())
+    
+    async def _run_ai_worker(self):
+        """Dispatch queued AI requests concurrently, keeping at most OLLAMA_NUM_PARALLEL in flight"""
+        semaphore = asyncio.Semaphore(self.OLLAMA_NUM_PARALLEL)
+        running_tasks = set()
+        
+        # Load the model now so the first review doesn't pay for it
+        await warm_up_async()
+        
+        while self.ai_worker_running:
+            try:
+                # Wait for a task without blocking the event loop
+                ai_task = await asyncio.to_thread(self._get_ai_task)
+                if ai_task is None:
+                    continue
+                
+                # Start the request right away, it streams back while the next task is awaited
+                prompt, on_chunk, on_done = ai_task
+                task = asyncio.create_task(self._stream_ai_task(semaphore, prompt, on_chunk, on_done))
+                running_tasks.add(task)
+                task.add_done_callback(running_tasks.discard)
                 
-            except queue.Empty:
-                # Queue is empty, continue waiting
-                continue
             except Exception as e:
                 # Error occurred, log it and continue
                 print(f"AI worker error: {e}")
                 continue
     
-    def animate_progress_bar(self):
-        """Animate the progress bar when checking for commits"""
-        if self.animation_running:
-            current = self.progress_bar.get()
-            if current >= 1.0:
-                next_val = 0
-            else:
-                next_val = current + 0.05
-            self.progress_bar.set(next_val)
-            self.after(100, self.animate_progress_bar)
-        else:
-            self.progress_bar.set(0)
+    def _get_ai_task(self):
+        """
+        Wait for the next AI task.
+        
+        Returns:
+            tuple: Queued task, or None if none arrived before the timeout
+        """
+        try:
+            # Get task from queue with timeout
+            return self.ai_queue.get(timeout=1.0)
+        except queue.Empty:
+            # Queue is empty, continue waiting
+            return None
+    
+    async def _stream_ai_task(self, semaphore, prompt, on_chunk, on_done):
+        """Stream a single AI response back to the main thread as it is generated"""
+        pending_chunks = []
+        last_flush = time.monotonic()
+        error = None
+        try:
+            async with semaphore:
+                async for chunk in stream_ai_response_async(prompt):
+                    pending_chunks.append(chunk)
+                    
+                    # Send text back to main thread in small groups instead of once per token
+                    if time.monotonic() - last_flush >= self.STREAM_FLUSH_MS / 1000:
+                        text = "".join(pending_chunks)
+                        pending_chunks.clear()
+                        self.after(0, lambda t=text: on_chunk(t))
+                        last_flush = time.monotonic()
+        except Exception as e:
+            # Reported separately so a partial response is never taken for a full review
+            error = e
+        finally:
+            if pending_chunks:
+                text = "".join(pending_chunks)
+                self.after(0, lambda t=text: on_chunk(t))
+            
+            # Mark task as done
+            self.ai_queue.task_done()
+        self.after(0, lambda: on_done(error))
+    
+    def _reset_review_text(self, text):
+        """Replace the whole review text with a single delete and insert"""
+        self._review_stream_active = False
+        self.review_text.configure(state="normal")
+        self.review_text.delete("0.0", "end")
+        self.review_text.insert("0.0", text)
+        self.review_text.configure(state="disabled")
     
     def start_animation(self):
-        """Start the progress bar animation"""
-        self.animation_running = True
-        self.animate_progress_bar()
+        """
+        Start the progress bar animation.
+        
+        The indeterminate bar redraws about 50 times a second, so it only runs while a review is generated.
+        """
+        self._animation_running = True
+        self.progress_bar.configure(mode="indeterminate")
+        # Nothing to draw while minimized, _on_map_change starts it once the window is shown
+        if self.winfo_viewable():
+            self.progress_bar.start()
     
     def stop_animation(self):
         """Stop the progress bar animation"""
-        self.animation_running = False
+        self._animation_running = False
+        self.progress_bar.stop()
+        # The indeterminate bar keeps drawing its last position, only a determinate one shows empty
+        self.progress_bar.configure(mode="determinate")
         self.progress_bar.set(0)
     
+    def _on_map_change(self, event, mapped):
+        """Track whether the window is minimized, and catch up on deferred reviews when it is shown again"""
+        # Child widgets report their own map events through the window's bindings
+        if event.widget is not self:
+            return
+        self.interactive = mapped
+        
+        # Its redraws would keep waking the process while nothing is shown
+        if self._animation_running:
+            if mapped:
+                self.progress_bar.start()
+            else:
+                self.progress_bar.stop()
+        
+        if mapped:
+            self._flush_deferred_reviews()
+    
     def toggle_auto_check(self):
         """Toggle automatic checking"""
         if self.auto_check_var.get():
@@ -378,7 +877,7 @@ class CommitReviewApp(ctk.CTk):
         else:
             self.update_status("Auto-checking disabled", "info")
             self.running = False
-            # If the thread exists and is alive, it will stop on next loop iteration
+            self._cancel_scheduled_check()
     
     def check_now(self):
         """Manually check for updates"""
@@ -392,17 +891,64 @@ class CommitReviewApp(ctk.CTk):
         if self.repo_path:
             try:
                 self.update_status("Refreshing repository...", "info")
-                self.repo = Repo(self.repo_path)
-                if hasattr(self.repo.remotes, 'origin'):
-                    self.repo.remotes.origin.fetch()
-                self.update_status("Repository refreshed", "success")
-                self.update_commit_info()
-                self.check_now()
+                # Fetch in the background so the UI doesn't freeze on the network
+                threading.Thread(target=self._refresh_in_background, daemon=True).start()
             except Exception as e:
                 self.update_status(f"Error refreshing repository: {str(e)}", "error")
     
+    def _refresh_in_background(self):
+        """Fetch from the remote off the UI thread, then update the UI"""
+        try:
+            self.fetch_remote()
+        except Exception as e:
+            self.after(0, lambda e=e: self.update_status(f"Error refreshing repository: {str(e)}", "error"))
+            return
+        self.after(0, self._finish_refresh)
+    
+    def _finish_refresh(self):
+        """Update the UI after a repository refresh"""
+        self.update_status("Repository refreshed", "success")
+        self.update_commit_info()
+        self.check_now()
+    
+    def fetch_remote(self):
+        """
+        Fetch from origin, skipping if another fetch has just completed.
+        
+        Concurrent callers wait for the fetch in progress instead of starting
+        a second one.
+        
+        Returns:
+            bool: True if a fetch was performed
+        """
+        if not hasattr(self.repo.remotes, 'origin'):
+            return False
+        
+        with self._fetch_lock:
+            if time.monotonic() - self._last_fetch_ts < self.MIN_FETCH_INTERVAL:
+                return False
+            self.repo.remotes.origin.fetch()
+            self._last_fetch_ts = time.monotonic()
+            return True
+    
     def update_status(self, message, status_type="info"):
-        """Update status with different styling based on status type"""
+        """
+        Update status with different styling based on status type.
+        
+        Several updates in a row are coalesced, only the last one is drawn once the UI is idle.
+        """
+        # Only schedule a flush for the first update since the last one
+        if self._pending_status is None:
+            self.after_idle(self._flush_status)
+        self._pending_status = (message, status_type)
+    
+    def _flush_status(self):
+        """Draw the latest status passed to update_status"""
+        if self._pending_status is None:
+            return
+        message, status_type = self._pending_status
+        self._pending_status = None
+        
         status_colors = {
             "info": "gray60",
             "success": "green",
@@ -434,6 +980,8 @@ class CommitReviewApp(ctk.CTk):
             self.repo_path = repo_path
             self.repo = Repo(self.repo_path)
             self.last_commit_hash = self.repo.head.commit.hexsha
+            self.last_upstream_hash = self._get_upstream_hash()
+            self._enable_fsmonitor()
             
             # Update UI
             self.repo_path_label.configure(text=os.path.basename(repo_path))
@@ -444,6 +992,9 @@ class CommitReviewApp(ctk.CTk):
             # Display commit info
             self.update_commit_info()
             
+            # Watch for local ref changes
+            self._start_ref_watcher()
+            
             # Start monitoring if auto-check is enabled
             if self.auto_check_var.get():
                 self.start_monitoring()
@@ -454,13 +1005,30 @@ class CommitReviewApp(ctk.CTk):
         except Exception as e:
             self.update_status(f"Error initializing repository: {str(e)}", "error")
     
-    def update_commit_info(self):
-        """Update the commit info display"""
+    def _enable_fsmonitor(self):
+        """Turn on git's builtin file system monitor and untracked cache for the repository"""
+        # The builtin fsmonitor daemon needs Git 2.36+ and is only available on Windows and macOS
+        if sys.platform not in ('win32', 'darwin') or self.repo.git.version_info < (2, 36):
+            return
+        
+        try:
+            with self.repo.config_writer() as config:
+                # Don't override settings the user already made for this repository
+                if not config.has_option('core', 'fsmonitor'):
+                    config.set_value('core', 'fsmonitor', 'true')
+                if not config.has_option('core', 'untrackedCache'):
+                    config.set_value('core', 'untrackedCache', 'true')
+        except Exception as e:
+            print(f"Warning: Could not enable fsmonitor: {e}")
+    
+    def update_commit_info(self, commit=None):
+        """Update the commit info display (defaults to the HEAD commit)"""
         if not self.repo:
             return
             
         try:
-            commit = self.repo.head.commit
+            if commit is None:
+                commit = self.repo.head.commit
             author = commit.author.name
             date = datetime.fromtimestamp(commit.committed_date).strftime("%Y-%m-%d %H:%M")
             
@@ -481,160 +1049,599 @@ class CommitReviewApp(ctk.CTk):
                         info_text += "..."
             
             # Add branch info
-            try:
-                branch_name = self.repo.active_branch.name
+            branch_name = self._get_branch_name()
+            if branch_name:
                 info_text += f"\nBranch: {branch_name}"
-            except:
-                pass  # Detached HEAD state or other issue
             
             self.commit_info.configure(text=info_text)
         except Exception as e:
             self.commit_info.configure(text=f"Error getting commit info: {str(e)}")
     
     def start_monitoring(self):
-        """Start the monitoring thread"""
+        """Start periodic checking for new commits"""
         if not self.running:
             self.running = True
-            self.monitor_thread = threading.Thread(target=self.check_commits_periodically)
-            self.monitor_thread.daemon = True
-            self.monitor_thread.start()
+            self.poll_interval = self._get_check_interval()
+            self._tick()
             self.update_status("Monitoring for changes", "info")
-            self.start_animation()
     
     def on_closing(self):
         """Handle the window closing event."""
         self.running = False
+        self._cancel_scheduled_check()
+        self._stop_ref_watcher()
         self.ai_worker_running = False
         # Wait a moment for threads to clean up
         time.sleep(0.2)
         self.destroy()
     
-    def check_commits_periodically(self):
-        """Periodically check for new commits and update the UI."""
-        while self.running and self.auto_check_var.get():
+    def _get_check_interval(self):
+        """Get the check interval in seconds (default to 30 seconds if invalid)"""
+        try:
+            interval = int(self.check_interval_var.get())
+            if interval < 5:  # Minimum 5 seconds
+                interval = 5
+        except:
+            interval = 30
+        return interval
+    
+    def _schedule_check(self):
+        """Schedule the next check for new commits on the Tk event loop"""
+        if self.running and self.auto_check_var.get():
+            self._check_after_id = self.after(self.poll_interval * 1000, self._tick)
+    
+    def _cancel_scheduled_check(self):
+        """Cancel the pending check, if any"""
+        if self._check_after_id is not None:
+            self.after_cancel(self._check_after_id)
+            self._check_after_id = None
+    
+    def _tick(self):
+        """Run one check for new commits, doing the git work on a short-lived thread"""
+        self._check_after_id = None
+        if not self.running or not self.auto_check_var.get():
+            self.running = False
+            return
+        # A check still running will schedule the next one when it finishes
+        if self._check_in_progress:
+            return
+        self._check_in_progress = True
+        threading.Thread(target=self._check_for_new_commit, daemon=True).start()
+    
+    def _check_for_new_commit(self):
+        """Fetch and read HEAD in the background, then report back to the main thread."""
+        head = None
+        upstream_hash = None
+        error = None
+        try:
+            # Pull latest changes if the remote branch moved since the last fetch
             try:
-                # Get check interval (default to 30 seconds if invalid)
-                try:
-                    interval = int(self.check_interval_var.get())
-                    if interval < 5:  # Minimum 5 seconds
-                        interval = 5
-                except:
-                    interval = 30
-                
-                # Pull latest changes if remote exists
-                if hasattr(self.repo.remotes, 'origin'):
-                    try:
-                        self.repo.remotes.origin.fetch()
-                    except GitCommandError:
-                        # Log but don't fail on fetch errors
-                        print("Warning: Could not fetch from remote")
-                
-                # Check if HEAD has changed
-                current_hash = self.repo.head.commit.hexsha
-                
-                if current_hash != self.last_commit_hash:
-                    self.after(0, lambda: self.update_status("New commit found! Updating review...", "success"))
-                    self.last_commit_hash = current_hash
-                    
-                    # Update the UI from the main thread
-                    self.after(0, self.update_commit_review)
-                    self.after(0, self.update_commit_info)
-                
-                # Update last check time
-                check_time = time.strftime("%H:%M:%S")
-                self.after(0, lambda t=check_time: self.last_check_label.configure(
-                    text=f"Last check: {t}"
-                ))
-                
-            except Exception as e:
-                self.after(0, lambda e=e: self.update_status(f"Error: {str(e)}", "error"))
+                remote_hash = self._get_remote_hash()
+                if remote_hash is None or remote_hash != self._last_remote_hash:
+                    if self.fetch_remote():
+                        self._last_remote_hash = remote_hash
+            except GitCommandError:
+                # Log but don't fail on fetch errors
+                print("Warning: Could not fetch from remote")
             
-            # Wait before next check
-            time.sleep(interval)
+            # Check if HEAD or its upstream branch has changed
+            head = self.repo.head.commit
+            upstream_hash = self._get_upstream_hash()
+        except Exception as e:
+            error = e
+        
+        self.after(0, lambda: self._finish_check(head, upstream_hash, error))
+    
+    def _get_upstream_hash(self):
+        """
+        Get the commit the current branch points to on origin, as of the last fetch.
+        
+        Returns:
+            str: Commit hash of origin/<branch>, or None if there is no such branch
+        """
+        branch_name = self._get_branch_name()
+        if not branch_name or not hasattr(self.repo.remotes, 'origin'):
+            return None
+        try:
+            return self.repo.remotes.origin.refs[branch_name].commit.hexsha
+        except IndexError:
+            # Branch has not been pushed
+            return None
+    
+    def _get_remote_hash(self):
+        """
+        Look up the tip of the current branch on origin without downloading objects.
+        
+        Returns:
+            str: Commit hash on origin, or None if it can't be determined
+        """
+        branch_name = self._get_branch_name()
+        if not branch_name or not hasattr(self.repo.remotes, 'origin'):
+            return None
+        try:
+            output = self.repo.git.ls_remote('origin', f'refs/heads/{branch_name}')
+        except GitCommandError:
+            # Fall back to a regular fetch
+            return None
+        return output.split()[0] if output else None
+    
+    def _get_branch_name(self):
+        """
+        Get the active branch name straight from .git/HEAD.
+        
+        Reading the small file is cheap, and unlike a cache keyed on the commit it sees a
+        new branch created or checked out at the same commit. Safe to call from any thread.
+        
+        Returns:
+            str: Branch name, or None in detached HEAD state
+        """
+        try:
+            with open(os.path.join(self.repo.git_dir, 'HEAD'), encoding='utf-8') as f:
+                head = f.read().strip()
+        except OSError:
+            return None
+        # A detached HEAD holds a commit hash instead of a ref
+        if head.startswith('ref: refs/heads/'):
+            return head[len('ref: refs/heads/'):]
+        return None
     
-    def update_commit_review(self):
-        """Update the review text based on the latest commit."""
+    def _finish_check(self, head, upstream_hash, error):
+        """Update the UI with the result of a check and schedule the next one."""
+        self._check_in_progress = False
+        current_hash = head.hexsha if head is not None else None
+        if error is not None:
+            self.update_status(f"Error: {str(error)}", "error")
+        elif current_hash != self.last_commit_hash:
+            self._on_new_commit(head)
+        elif upstream_hash not in (None, self.last_upstream_hash, current_hash):
+            # Review new upstream commits without touching the working tree
+            self._on_new_upstream_commit(upstream_hash)
+        else:
+            # Back off while nothing changes, a new commit resets the interval
+            self.poll_interval = max(
+                self._get_check_interval(), min(self.poll_interval * 2, self.MAX_POLL_INTERVAL)
+            )
+        
+        if upstream_hash is not None:
+            self.last_upstream_hash = upstream_hash
+        
+        # Update last check time
+        check_time = time.strftime("%H:%M:%S")
+        self.last_check_label.configure(text=f"Last check: {check_time}")
+        
+        # Wait before next check
+        self._schedule_check()
+    
+    def _on_new_commit(self, head):
+        """Review a commit that HEAD has moved to"""
+        self.update_status("New commit found! Updating review...", "success")
+        previous_hash = self.last_commit_hash
+        self.last_commit_hash = head.hexsha
+        self.poll_interval = self._get_check_interval()
+        self.review_new_commits(previous_hash, head.hexsha)
+        self.update_commit_info(head)
+    
+    def _on_new_upstream_commit(self, upstream_hash):
+        """Review a commit that the upstream branch has moved to"""
+        self.update_status(f"New commit on origin/{self._get_branch_name()}! Updating review...", "success")
+        self.poll_interval = self._get_check_interval()
+        self.review_new_commits(self.last_upstream_hash, upstream_hash)
+        self.update_commit_info(self.repo.commit(upstream_hash))
+    
+    def _start_ref_watcher(self):
+        """Start watching the repository's refs so local commits are picked up immediately"""
+        self._stop_ref_watcher()
+        if Observer is None:
+            return
+        
+        try:
+            # Called from the watcher thread, hand over to the main thread
+            handler = GitRefWatcher(self.repo.git_dir, lambda: self.after(0, self._on_ref_change))
+            self._ref_observer = Observer()
+            self._ref_observer.daemon = True
+            self._ref_observer.schedule(handler, self.repo.git_dir, recursive=True)
+            
+            # Local edits mean the user is active, so go back to checking often
+            if self.repo.working_tree_dir:
+                work_tree_handler = WorkTreeWatcher(
+                    self.repo.working_tree_dir, self.repo.git_dir,
+                    lambda: self.after(0, self._on_worktree_change),
+                    ignore_spec=load_ignore_spec(self.repo)
+                )
+                self._ref_observer.schedule(work_tree_handler, self.repo.working_tree_dir, recursive=True)
+            self._ref_observer.start()
+        except Exception as e:
+            # Fall back to polling only
+            print(f"Warning: Could not watch repository refs: {e}")
+            self._ref_observer = None
+    
+    def _stop_ref_watcher(self):
+        """Stop watching the repository's refs"""
+        if self._ref_observer is not None:
+            self._ref_observer.stop()
+            self._ref_observer = None
+    
+    def _on_ref_change(self):
+        """Handle a ref change, coalescing the burst of events a single commit produces"""
+        if self._ref_change_after_id is None:
+            self._ref_change_after_id = self.after(200, self._check_local_head)
+    
+    def _on_worktree_change(self):
+        """Return to the base check interval when files in the working tree change"""
+        base_interval = self._get_check_interval()
+        if not self.running or self.poll_interval <= base_interval:
+            return
+        
+        self.poll_interval = base_interval
+        # Bring the pending check forward
+        if self._check_after_id is not None:
+            self._cancel_scheduled_check()
+            self._schedule_check()
+    
+    def _check_local_head(self):
+        """Review the new HEAD commit if a ref change moved it"""
+        self._ref_change_after_id = None
+        if not self.running or not self.repo:
+            return
+        
+        try:
+            head = self.repo.head.commit
+        except Exception as e:
+            self.update_status(f"Error: {str(e)}", "error")
+            return
+        
+        if head.hexsha != self.last_commit_hash:
+            self._on_new_commit(head)
+    
+    def update_commit_review(self, commit=None):
+        """Update the review text based on the given commit (defaults to the HEAD commit)."""
         if not self.repo:
             return
             
         try:
-            current_commit = self.repo.head.commit
+            current_commit = commit if commit is not None else self.repo.head.commit
+            commit_hash = current_commit.hexsha
             
-            # Get the diff
-            code_diff = ""
-            try:
-                # For first commit or if HEAD~1 doesn't exist
-                if len(list(self.repo.iter_commits())) > 1:
-                    for diff in current_commit.diff("HEAD~1", create_patch=True):
-                        code_diff += str(diff.diff.decode('utf-8', errors='replace'))
-                else:
-                    # If this is the first commit
-                    for blob in current_commit.tree.traverse():
-                        if blob.type == 'blob':  # This is a file
-                            code_diff += f"+++ {blob.path}\n"
-                            code_diff += "+"+blob.data_stream.read().decode('utf-8', errors='replace').replace('\n', '\n+')
-            except Exception as e:
-                code_diff = f"Could not get diff: {str(e)}"
+            # This commit's review is already streaming into the textbox, don't request it twice
+            if commit_hash == self._streaming_review_hash:
+                return
+            self._begin_review()
             
-            # Get affected files
-            files_changed = []
-            try:
-                if len(list(self.repo.iter_commits())) > 1:
-                    for diff_item in current_commit.diff("HEAD~1"):
-                        if diff_item.a_path:
-                            files_changed.append(diff_item.a_path)
-                        elif diff_item.b_path:
-                            files_changed.append(diff_item.b_path)
-                else:
-                    # For first commit, list all files
-                    for blob in current_commit.tree.traverse():
-                        if blob.type == 'blob':
-                            files_changed.append(blob.path)
-            except:
-                pass
-            
-            # Prepare the prompt with commit info
-            text_prompt = (
-                f"Please review the following Git commit:\n\n"
-                f"COMMIT HASH: {current_commit.hexsha}\n"
-                f"AUTHOR: {current_commit.author.name}\n"
-                f"DATE: {datetime.fromtimestamp(current_commit.committed_date).strftime('%Y-%m-%d %H:%M')}\n"
-                f"COMMIT MESSAGE:\n{current_commit.message}\n\n"
-                f"FILES CHANGED: {', '.join(files_changed)}\n\n"
-                f"DIFF:\n{code_diff}"
-            )
+            # Reuse the stored review if this commit was already analyzed
+            cached_review = self._read_cached_reviews([commit_hash]).get(commit_hash)
+            if cached_review is not None:
+                self._reset_review_text(cached_review)
+                
+                check_time = time.strftime("%H:%M:%S")
+                self.last_check_label.configure(text=f"Last check: {check_time}")
+                self.update_status("Review loaded from cache", "success")
+                self.stop_animation()
+                return
             
             # Update status while waiting for AI
-            self.review_text.configure(state="normal")
-            self.review_text.delete("0.0", "end")
-            self.review_text.insert("0.0", "Generating review with AI... This may take a moment.")
-            self.review_text.configure(state="disabled")
+            self._reset_review_text("Generating review with AI... This may take a moment.")
             self.update_status("Generating review with AI...", "info")
+            self.start_animation()
+            
+            self._queue_review((commit_hash,))
+            
+        except Exception as e:
+            self._show_review_error(e)
+    
+    def review_new_commits(self, old_hash, new_hash):
+        """
+        Review the commits between two hashes, batching them into one AI request when there are several.
+        
+        Args:
+            old_hash (str): Last commit that was already reviewed, or None
+            new_hash (str): Newest commit, which is shown once reviewed
+        """
+        # The window is minimized, collect the commits and review them together later
+        if not self.interactive:
+            self._defer_review(old_hash, new_hash)
+        else:
+            self._review_commit_range(old_hash, new_hash)
+    
+    def _review_commit_range(self, old_hash, new_hash):
+        """Review the commits after old_hash up to new_hash, see review_new_commits"""
+        try:
+            new_commits = []
+            if old_hash:
+                new_commits = list(self.repo.iter_commits(f'{old_hash}..{new_hash}', max_count=self.MAX_BATCH_COMMITS))
+            
+            # Oldest first, skipping merges and commits that were already reviewed
+            cached_reviews = self._read_cached_reviews([commit.hexsha for commit in new_commits])
+            pending = [
+                commit for commit in reversed(new_commits)
+                if len(commit.parents) <= 1 and commit.hexsha not in cached_reviews
+            ]
+            if len(pending) <= 1 or pending[-1].hexsha != new_hash:
+                # Reuse the commit object already read, if any
+                new_commit = new_commits[0] if new_commits else self.repo.commit(new_hash)
+                self.update_commit_review(new_commit)
+                return
+            
+            if new_hash == self._streaming_review_hash:
+                return
+            self._begin_review()
+            
+            # Update status while waiting for AI
+            self._reset_review_text(f"Generating review of {len(pending)} new commits with AI... This may take a moment.")
+            self.update_status(f"Generating review of {len(pending)} new commits with AI...", "info")
+            self.start_animation()
+            
+            self._queue_review(tuple(commit.hexsha for commit in pending))
+            
+        except Exception as e:
+            self._show_review_error(e)
+    
+    def _defer_review(self, old_hash, new_hash):
+        """Remember new commits to review once the window is restored"""
+        if self._deferred_review is not None:
+            old_hash = self._deferred_review[0]
+        self._deferred_review = (old_hash, new_hash)
+        self.update_status("New commits found! Review will start when the window is restored", "info")
+        
+        # Don't let a large backlog build up
+        if old_hash:
+            try:
+                commit_range = self.repo.iter_commits(f'{old_hash}..{new_hash}', max_count=self.MAX_BATCH_COMMITS)
+                pending_count = sum(1 for _ in commit_range)
+            except GitCommandError:
+                pending_count = 0
+            if pending_count >= self.MAX_BATCH_COMMITS:
+                self._flush_deferred_reviews()
+    
+    def _flush_deferred_reviews(self):
+        """Review the commits collected while the window was minimized"""
+        if self._deferred_review is None:
+            return
+        old_hash, new_hash = self._deferred_review
+        self._deferred_review = None
+        self._review_commit_range(old_hash, new_hash)
+    
+    def _review_individually(self, commit_hashes):
+        """Review commits one request at a time, the last one is shown"""
+        # The batch request these replace was never sent
+        self._streaming_review_hash = None
+        for commit_hash in commit_hashes:
+            self.update_commit_review(self.repo.commit(commit_hash))
+    
+    def _queue_review(self, commit_hashes):
+        """
+        Queue a review of one or more commits, streaming the result into the review text.
+        
+        Args:
+            commit_hashes (tuple[str]): Commits to review, oldest first; the last one is shown
+        """
+        review_hash = commit_hashes[-1]
+        request_id = self._review_request_id
+        self._streaming_review_hash = review_hash
+        response_parts = []
+        
+        def process_ai_response(chunk):
+            response_parts.append(chunk)
+            
+            # Ignore chunks from a review that has since been replaced, even one of the same commit
+            if request_id != self._review_request_id:
+                return
             
-            # Queue AI task
-            def process_ai_response(response):
+            if not self._review_stream_active:
+                # Clear the placeholder once and keep the textbox writable for the whole stream
+                self._review_stream_active = True
                 self.review_text.configure(state="normal")
                 self.review_text.delete("0.0", "end")
-                self.review_text.insert("0.0", response)
-                self.review_text.configure(state="disabled")
-                
-                # Update status
-                check_time = time.strftime("%H:%M:%S")
-                self.last_check_label.configure(text=f"Last check: {check_time}")
-                self.update_status("Review updated successfully", "success")
-                self.stop_animation()
+            self.review_text.insert("end", chunk)
+        
+        def finish_ai_response(error=None):
+            # Store the review so these commits are never sent to the model again
+            response = "".join(response_parts)
+            if response and error is None:
+                if len(commit_hashes) == 1:
+                    sections = [response]
+                else:
+                    sections = [section.strip() for section in response.split(self.REVIEW_SEPARATOR)]
+                    sections = [section for section in sections if section]
+                # Only cache a batch when the model kept one section per commit
+                if len(sections) == len(commit_hashes):
+                    self._store_reviews(dict(zip(commit_hashes, sections)))
             
-            # Add task to queue
-            self.ai_queue.put((text_prompt, process_ai_response))
+            if request_id != self._review_request_id:
+                return
+            self._streaming_review_hash = None
             
-        except Exception as e:
-            self.update_status(f"Error generating review: {str(e)}", "error")
-            self.review_text.configure(state="normal")
-            self.review_text.delete("0.0", "end")
-            self.review_text.insert("0.0", f"Error generating review: {str(e)}")
+            # Nothing was streamed, the prompt couldn't be built or the model didn't answer
+            if error is not None and not response_parts:
+                self._show_review_error(error)
+                return
+            
+            # Keep whatever was streamed before the failure, followed by the error
+            if error is not None:
+                process_ai_response(
+                    f"\n\nError generating AI response: {str(error)}\n\n"
+                    "Please check your Ollama setup and ensure the model is available."
+                )
+            
+            self._review_stream_active = False
             self.review_text.configure(state="disabled")
+            
+            # Update status
+            check_time = time.strftime("%H:%M:%S")
+            self.last_check_label.configure(text=f"Last check: {check_time}")
+            if error is not None:
+                self.update_status(f"Error generating review: {str(error)}", "error")
+            else:
+                self.update_status("Review updated successfully", "success")
             self.stop_animation()
-
+        
+        # Build the diff in the background, it is forwarded to the AI queue from there
+        self._diff_queue.put((commit_hashes, process_ai_response, finish_ai_response))
+    
+    def _read_cached_reviews(self, commit_hashes):
+        """
+        Look up stored reviews.
+        
+        The cache is only opened for the lookup, so several copies of the app can share it.
+        
+        Args:
+            commit_hashes (list[str]): Commits to look up
+            
+        Returns:
+            dict: Stored review per commit hash, for the commits that have one
+        """
+        reviews = {}
+        try:
+            with shelve.open(self._review_cache_path, flag='r') as cache:
+                for commit_hash in commit_hashes:
+                    cache_key = review_cache_key(commit_hash)
+                    if cache_key in cache:
+                        reviews[commit_hash] = cache[cache_key]
+        except Exception:
+            # Not created yet, or another copy of the app is writing to it
+            pass
+        return reviews
+    
+    def _store_reviews(self, reviews):
+        """
+        Store reviews so these commits are never sent to the model again.
+        
+        Args:
+            reviews (dict): Review per commit hash
+        """
+        try:
+            with shelve.open(self._review_cache_path) as cache:
+                for commit_hash, review in reviews.items():
+                    cache[review_cache_key(commit_hash)] = review
+        except Exception as e:
+            # Another copy of the app holds the cache, the review is just asked for again next time
+            print(f"Warning: Could not store review: {e}")
+    
+    def _begin_review(self):
+        """Make the next review the one shown, any review still streaming stops updating the textbox"""
+        self._review_request_id += 1
+        self._streaming_review_hash = None
+    
+    def _show_review_error(self, error):
+        """Show an error that stopped a review from being generated"""
+        self.update_status(f"Error generating review: {str(error)}", "error")
+        self._reset_review_text(f"Error generating review: {str(error)}")
+        self.stop_animation()
+    
+    def _get_skip_note(self, commit):
+        """
+        Check whether a commit can be described without asking the model.
+        
+        Args:
+            commit (git.Commit): Commit to check
+            
+        Returns:
+            str: Note shown instead of a review, or None if the commit should be reviewed
+        """
+        # A merge only diffs against its first parent, which repeats the work that was merged
+        if len(commit.parents) > 1:
+            return f"Merge commit {commit.hexsha[:8]}: {commit.summary}\n\nMerge commits are not reviewed."
+        
+        # The numstat is enough to tell, the patch is only built for commits that get reviewed
+        try:
+            files_changed = [entry[0] for entry in get_commit_numstat(commit.repo, commit.hexsha)]
+        except Exception:
+            # Let the review report the failing diff
+            return None
+        if files_changed and all(is_noise_file(path) for path in files_changed):
+            return (
+                f"Commit {commit.hexsha[:8]}: {commit.summary}\n\n"
+                f"Only generated files changed ({', '.join(files_changed)}), no review needed."
+            )
+        
+        return None
+    
+    def _get_prompt_diff(self, commit, max_chars=MAX_DIFF_CHARS):
+        """
+        Get the diff of a commit as it should appear in a prompt.
+        
+        Args:
+            commit (git.Commit): Commit to diff
+            max_chars (int): Maximum number of characters of diff to keep
+            
+        Returns:
+            tuple: Diff text without noise files, and the changed file paths
+        """
+        try:
+            code_diff, files_changed = get_prompt_diff(commit.repo, commit.hexsha, max_chars)
+        except Exception as e:
+            return f"Could not get diff: {str(e)}", ()
+        return code_diff, files_changed
+    
+    def _format_commit_details(self, commit, code_diff, files_changed):
+        """
+        Format the details of a commit for a prompt.
+        
+        Args:
+            commit (git.Commit): Commit to describe
+            code_diff (str): Diff of the commit
+            files_changed (tuple[str]): Paths changed by the commit
+            
+        Returns:
+            str: Commit info followed by its diff
+        """
+        # A vendor import or the first commit can list thousands of paths
+        listed_files = ', '.join(files_changed[:MAX_LISTED_FILES])
+        if len(files_changed) > MAX_LISTED_FILES:
+            listed_files += f" ... and {len(files_changed) - MAX_LISTED_FILES} more"
+        
+        return (
+            f"COMMIT HASH: {commit.hexsha}\n"
+            f"AUTHOR: {commit.author.name}\n"
+            f"DATE: {datetime.fromtimestamp(commit.committed_date).strftime('%Y-%m-%d %H:%M')}\n"
+            f"COMMIT MESSAGE:\n{commit.message}\n\n"
+            f"FILES CHANGED: {listed_files}\n\n"
+            f"DIFF:\n{code_diff}"
+        )
+    
+    def _build_review_prompt(self, current_commit):
+        """
+        Build the AI prompt for a commit, including its diff.
+        
+        Args:
+            current_commit (git.Commit): Commit to review
+            
+        Returns:
+            str: Prompt containing commit info and diff
+        """
+        code_diff, files_changed = self._get_prompt_diff(current_commit)
+        
+        # The instructions live in the system prompt, the message only fills in the commit
+        return self._format_commit_details(current_commit, code_diff, files_changed)
+    
+    def _build_batch_review_prompt(self, commits):
+        """
+        Build a single AI prompt reviewing several commits.
+        
+        Args:
+            commits (list[git.Commit]): Commits to review, oldest first
+            
+        Returns:
+            str: Prompt containing every commit, or None if their diffs don't fit the model context together
+        """
+        # Each review needs room in the context too, so more commits leave less room for diffs
+        prompt_budget = MAX_PROMPT_CHARS - len(commits) * self.BATCH_REPLY_CHARS
+        
+        sections = []
+        total_size = 0
+        for index, commit in enumerate(commits, start=1):
+            code_diff, files_changed = self._get_prompt_diff(commit)
+            section = f"[[Commit {index}]]\n" + self._format_commit_details(commit, code_diff, files_changed)
+            total_size += len(section)
+            if total_size > prompt_budget:
+                return None
+            sections.append(section)
+        
+        return (
+            f"Review each of the following {len(commits)} Git commits. "
+            f"Reply with {len(commits)} reviews in the same order, "
+            f"separated by a line containing only {self.REVIEW_SEPARATOR}\n\n"
+            + "\n\n".join(sections)
+        )
 
 if __name__ == "__main__":
     app = CommitReviewApp()